@@ -1,19 +1,14 @@
-import base64
 import json
 import os
-import platform
+import re
 import sys
 import traceback
+from functools import lru_cache
 from stat import S_ISFIFO
 
 import click
-import nbclient
-import yaml
 
-from nbconvert.execute import execute_notebook
 from nbconvert.log import logger
-from nbconvert.inspection import display_notebook_help
-from nbconvert.iorw import NoDatesSafeLoader, read_yaml_file
 from nbconvert.version import version
 
 click.disable_unicode_literals_warning = True
@@ -21,11 +16,37 @@ click.disable_unicode_literals_warning = True
 INPUT_PIPED = S_ISFIFO(os.fstat(0).st_mode)
 OUTPUT_PIPED = not sys.stdout.isatty()
 
+# Same as platform.python_version(), without importing platform on the --version path
+PYTHON_VERSION = "{}.{}.{}".format(*sys.version_info[:3])
+
+# Literal spellings accepted by ``int()``/``float()``, used to classify ``-p`` values without casting
+_DIGITS = r'\d+(?:_\d+)*'
+_INT_RE = re.compile(rf'\s*[-+]?{_DIGITS}\s*\Z')
+_FLOAT_RE = re.compile(
+    rf'\s*[-+]?(?:(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})(?:[eE][-+]?{_DIGITS})?|inf(?:inity)?|nan)\s*\Z',
+    re.IGNORECASE,
+)
+_CONSTS = {'True': True, 'False': False, 'None': None}
+
+
+def execute_notebook(*args, **kwargs):
+    """Defer importing the execution stack (nbclient, black, isort, ...) until a notebook actually runs."""
+    from nbconvert.execute import execute_notebook as _execute_notebook
+
+    return _execute_notebook(*args, **kwargs)
+
+
+def display_notebook_help(*args, **kwargs):
+    """Defer importing the inspection stack until ``--help-notebook`` is requested."""
+    from nbconvert.inspection import display_notebook_help as _display_notebook_help
+
+    return _display_notebook_help(*args, **kwargs)
+
 
 def print_nbconvert_version(ctx, param, value):
     if not value:
         return
-    print(f"{version} from {__file__} ({platform.python_version()})")
+    print(f"{version} from {__file__} ({PYTHON_VERSION})")
     ctx.exit()
 
 
@@ -161,6 +182,16 @@ def nbconvert(
 
     logger.setLevel(level=log_level)
 
+    try:
+        # SIMD accelerated decoder, when installed
+        from pybase64 import b64decode
+    except ImportError:
+        from base64 import b64decode
+
+    import yaml
+
+    from nbconvert.iorw import NoDatesSafeLoader, read_yaml_file
+
     # Read in Parameters
     parameters_final = {}
     if inject_input_path or inject_paths:
@@ -168,7 +199,7 @@ def nbconvert(
     if inject_output_path or inject_paths:
         parameters_final['NBCONVERT_OUTPUT_PATH'] = output_path
     for params in parameters_base64 or []:
-        parameters_final.update(yaml.load(base64.b64decode(params), Loader=NoDatesSafeLoader) or {})
+        parameters_final.update(yaml.load(b64decode(params), Loader=NoDatesSafeLoader) or {})
     for files in parameters_file or []:
         parameters_final.update(read_yaml_file(files) or {})
     for params in parameters_yaml or []:
@@ -181,6 +212,8 @@ def nbconvert(
     if help_notebook:
         sys.exit(display_notebook_help(click_ctx, notebook_path, parameters_final))
 
+    import nbclient
+
     try:
         generated_file = execute_notebook(
             input_path=input_path,
@@ -198,30 +231,31 @@ def nbconvert(
             json.dump({
                 "run_id": generated_file,
             }, outfile)
-        logger.info(f"Run Info saved to file: {save_path}")
+        logger.info("Run Info saved to file: %s", save_path)
     except nbclient.exceptions.DeadKernelError:
         # Exiting with a special exit code for dead kernels
         traceback.print_exc()
         sys.exit(138)
 
 
+# Parameter values repeat a handful of spellings ("True", "None", "10", ...), resolve each only once
+@lru_cache(maxsize=512)
 def _resolve_type(value):
-    if value == "True":
-        return True
-    elif value == "False":
-        return False
-    elif value == "None":
-        return None
-    elif _is_int(value):
+    if value in _CONSTS:
+        return _CONSTS[value]
+    elif _INT_RE.match(value):
         return int(value)
-    elif _is_float(value):
+    elif _FLOAT_RE.match(value):
         return float(value)
     else:
         return value
 
 
+@lru_cache(maxsize=512, typed=True)
 def _is_int(value):
-    """Use casting to check if value can convert to an `int`."""
+    """Check if value can convert to an `int`, without raising for strings that cannot."""
+    if isinstance(value, str):
+        return _INT_RE.match(value) is not None
     try:
         int(value)
     except ValueError:
@@ -230,8 +264,11 @@ def _is_int(value):
         return True
 
 
+@lru_cache(maxsize=512, typed=True)
 def _is_float(value):
-    """Use casting to check if value can convert to a `float`."""
+    """Check if value can convert to a `float`, without raising for strings that cannot."""
+    if isinstance(value, str):
+        return _FLOAT_RE.match(value) is not None
     try:
         float(value)
     except ValueError:
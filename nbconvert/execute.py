@@ -1,4 +1,6 @@
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import uuid
 import re
@@ -12,11 +14,33 @@ from maison.config import ProjectConfig
 from nbconvert.exceptions import NBConvertExecutionError
 from nbconvert.format import handle_missing_variables, find_files_containing_imports
 from nbconvert.inspection import _infer_parameters
-from nbconvert.iorw import get_pretty_path, load_notebook_node, local_file_io_cwd, write_ipynb, write_py
+from nbconvert.iorw import (
+    StreamHandler,
+    get_handler,
+    get_pretty_path,
+    load_notebook_node,
+    local_file_io_cwd,
+    write_ipynb,
+    write_py,
+)
 from nbconvert.log import logger
 from nbconvert.parameterize import add_builtin_parameters, parameterize_notebook, parameterize_path
 from nbconvert.utils import find_file
 
+# Artifact writes are independent IO operations, run them concurrently
+WRITE_WORKERS = 8
+
+BLACK_MODE = black.Mode(
+    target_versions={black.TargetVersion.PY38},
+    string_normalization=True,
+    is_pyi=False,
+)
+
+# Marks where each tagged cell starts once the cells are joined for a single black pass
+CELL_SEPARATOR = "# __NBCONVERT_SEP__ "
+_CELL_SEPARATOR_RE = re.compile(rf'^{CELL_SEPARATOR}', re.MULTILINE)
+_CELL_SEPARATOR_MARKER = CELL_SEPARATOR[1:].strip()
+
 
 def execute_notebook(
     input_path,
@@ -57,22 +81,23 @@ def execute_notebook(
     nb : NotebookNode
        Executed notebook object
     """
-    if isinstance(input_path, Path):
-        input_path = str(input_path)
-    if isinstance(output_path, Path):
-        output_path = str(output_path)
-    if isinstance(cwd, Path):
-        cwd = str(cwd)
+    input_path, output_path, cwd = _as_str(input_path), _as_str(output_path), _as_str(cwd)
 
     path_parameters = add_builtin_parameters(parameters)
-    input_path = parameterize_path(input_path, path_parameters)
-    output_path = parameterize_path(output_path, path_parameters)
-
-    logger.info(f"Input Notebook:  {get_pretty_path(input_path)}")
-    logger.info(f"Output Path: {get_pretty_path(output_path)}")
+    if input_path == output_path:
+        input_path = output_path = parameterize_path(input_path, path_parameters)
+    else:
+        input_path = parameterize_path(input_path, path_parameters)
+        output_path = parameterize_path(output_path, path_parameters)
+
+    # Resolving pretty paths goes through the I/O handlers, skip it when INFO is not emitted
+    log_info = logger.isEnabledFor(logging.INFO)
+    if log_info:
+        logger.info("Input Notebook:  %s", get_pretty_path(input_path))
+        logger.info("Output Path: %s", get_pretty_path(output_path))
     with local_file_io_cwd():
-        if cwd is not None:
-            logger.info(f"Working directory: {get_pretty_path(cwd)}")
+        if cwd is not None and log_info:
+            logger.info("Working directory: %s", get_pretty_path(cwd))
 
         nb = load_notebook_node(input_path)
 
@@ -80,9 +105,10 @@ def execute_notebook(
         if parameters:
             parameter_predefined = _infer_parameters(nb, name=kernel_name, language=language)
             parameter_predefined = {p.name for p in parameter_predefined}
+            # Iterate the parameters rather than a set difference, so warnings follow the given order
             for p in parameters:
                 if p not in parameter_predefined:
-                    logger.warning(f"Passed unknown parameter: {p}")
+                    logger.warning("Passed unknown parameter: %s", p)
             nb = parameterize_notebook(
                 nb,
                 parameters,
@@ -105,50 +131,107 @@ def execute_notebook(
         # Write tagged cell into separated python files
         version_uuid = uuid.uuid4()
         cell_buffers = prepare_notebook_cell(nb, parameters_specified)
+        cell_buffers = format_cell_buffers(cell_buffers, config)
+        # Project files are walked and modules looked up at most once per conversion, so that
+        # files created or installed since the last one are seen
+        file_index, import_index = {}, {}
+        # Claim every target before queuing anything, so that no two writes run against the
+        # same path and a cell module always wins over a copied module of the same name
+        written_paths = {f"{output_path}/{version_uuid}/{cell_tag}.py" for cell_tag in cell_buffers}
+        writes = []
         for cell_tag, cell_content in cell_buffers.items():
-            fix_import_buffer = fix_code(
-                original_source_code=cell_content,
-                config=config,
-            )
-            sorted_import_buffer = isort.code(fix_import_buffer)
-            cell_content = handle_missing_variables(sorted_import_buffer, cell_tag)
-            cell_content = black.format_str(
-                cell_content,
-                mode=black.Mode(
-                    target_versions={black.TargetVersion.PY38},
-                    string_normalization=True,
-                    is_pyi=False,
-                ),
-            )
-            write_py(cell_content, f"{output_path}/{version_uuid}/{cell_tag}.py")
+            writes.append((write_py, cell_content, f"{output_path}/{version_uuid}/{cell_tag}.py"))
 
             current_root_dir = os.environ.get('ROOT_PROJECT_DIR', os.getcwd())
             if not current_root_dir:
                 logger.info("Missing env ROOT_PROJECT_DIR")
-            missing_import_files = find_files_containing_imports(cell_content, current_root_dir)
-            logger.info(f"Missing imports path: {missing_import_files}")
+            missing_import_files = find_files_containing_imports(
+                cell_content, current_root_dir, file_index, import_index
+            )
+            logger.info("Missing imports path: %s", missing_import_files)
             for file_path in missing_import_files:
                 file_name = str(file_path).split('/')[-1]
                 final_output_path = f"{output_path}/{version_uuid}/{file_name}"
-                if not os.path.exists(final_output_path):
-                    with open(file_path, 'r') as f:
-                        file_content = f.read()
-                        write_py(file_content, final_output_path)
+                if final_output_path not in written_paths:
+                    written_paths.add(final_output_path)
+                    writes.append((_copy_py, file_path, final_output_path))
+
+        if isinstance(get_handler(f"{output_path}/{version_uuid}"), StreamHandler):
+            # Every artifact goes to the same stream, keep them in order
+            for write, *args in writes:
+                write(*args)
+        else:
+            with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+                pending_writes = [pool.submit(write, *args) for write, *args in writes]
+                # Re-raise the first failed write, if any
+                for pending_write in pending_writes:
+                    pending_write.result()
 
         raise_for_execution_errors(nb, output_path)
-        logger.info(f"Generated Python artifacts with UUID directory {version_uuid}")
+        logger.info("Generated Python artifacts with UUID directory %s", version_uuid)
 
         return f"{output_path}/{version_uuid}"
 
 
-def _prepare_code_buffer(code_buffer):
-    pattern = re.compile(r'\bdef\b\s+\w+\s*\(\[^\)]*\):\s*\(\[^]*?\)\(?=\s*\bdef\b|\s*$\)', re.DOTALL)
-    match = pattern.search(code_buffer)
+def _copy_py(file_path, output_path):
+    with open(file_path, 'r') as f:
+        write_py(f.read(), output_path)
 
-    if match:
-        return match.group(1).strip()
-    else:
-        return code_buffer
+
+def _as_str(path):
+    return str(path) if isinstance(path, Path) else path
+
+
+def format_cell_buffers(cell_buffers, config):
+    """Format the python code generated from tagged cells
+
+    Imports are fixed and sorted and undefined variables are declared cell by cell, since
+    those steps operate on the top of each buffer. Black then runs once over all the cells, unless a
+    cell already contains the separator marker.
+
+    Parameters
+    ----------
+    cell_buffers : dict
+       Mapping of cell tag to the python code generated from the cells with that tag
+    config : dict
+       autoimport configuration
+
+    Returns
+    -------
+    dict
+       Mapping of cell tag to the formatted python code
+    """
+    if not cell_buffers:
+        return {}
+
+    prepared_buffers = {}
+    for cell_tag, cell_content in cell_buffers.items():
+        fix_import_buffer = fix_code(
+            original_source_code=cell_content,
+            config=config,
+        )
+        sorted_import_buffer = isort.code(fix_import_buffer)
+        prepared_buffers[cell_tag] = handle_missing_variables(sorted_import_buffer, cell_tag)
+
+    # Black normalizes comments, so any occurrence of the marker could end up looking like a separator
+    if any(_CELL_SEPARATOR_MARKER in cell_content for cell_content in prepared_buffers.values()):
+        # Splitting the joined buffer would move code between cells, format them one by one instead
+        return {
+            cell_tag: black.format_str(cell_content, mode=BLACK_MODE)
+            for cell_tag, cell_content in prepared_buffers.items()
+        }
+
+    joined_buffers = [
+        f"{CELL_SEPARATOR}{cell_tag}\n{cell_content}" for cell_tag, cell_content in prepared_buffers.items()
+    ]
+
+    formatted_buffer = black.format_str("\n".join(joined_buffers), mode=BLACK_MODE)
+
+    formatted_buffers = {}
+    for chunk in _CELL_SEPARATOR_RE.split(formatted_buffer)[1:]:
+        cell_tag, _, cell_content = chunk.partition("\n")
+        formatted_buffers[cell_tag] = cell_content.strip("\n") + "\n"
+    return formatted_buffers
 
 
 def prepare_notebook_cell(nb, parameters):
@@ -161,19 +244,21 @@ def prepare_notebook_cell(nb, parameters):
             if cell.cell_type == 'code':
                 for tag in cell.metadata.tags:
                     parameters.add(tag)
+    parameters = frozenset(parameters)
 
+    # Accumulate the chunks of each buffer and join them once, rather than growing strings
     BUFFER = {}
     for cell in nb.cells:
         if cell.cell_type == 'code':
             for tag in cell.metadata.tags:
                 if tag in parameters:
                     if tag not in BUFFER:
-                        BUFFER[tag] = f"def {tag}():"
+                        BUFFER[tag] = [f"def {tag}():"]
                     cell_source = '\n' + cell.source
-                    cell_source = cell_source.replace('\n', '\n\t')
-                    BUFFER[tag] += cell_source + '\n'
+                    BUFFER[tag].append(cell_source.replace('\n', '\n\t'))
+                    BUFFER[tag].append('\n')
 
-    return BUFFER
+    return {tag: ''.join(chunks) for tag, chunks in BUFFER.items()}
 
 
 def prepare_notebook_metadata(nb, input_path, output_path, report_mode=False):
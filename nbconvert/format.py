@@ -1,6 +1,17 @@
 import ast
+import builtins
+import mmap
 import os
+import sys
 from collections import deque
+from functools import lru_cache
+from importlib.machinery import PathFinder
+from importlib.util import find_spec
+
+_BUILTIN_NAMES = frozenset(dir(builtins))
+
+# Directories that never hold project sources worth searching for imports
+_SKIPPED_DIRS = frozenset({'venv', '.venv', '__pycache__', '.git', 'node_modules', '.tox', 'build', 'dist'})
 
 
 class StaticAnalyzer(ast.NodeVisitor):
@@ -12,146 +23,119 @@ class StaticAnalyzer(ast.NodeVisitor):
         self.alias_def = set()
         self.assign_def = set()
         self.func_call = set()
+        self.name_load = set()
+        # Dispatch on the node class, instead of building 'visit_' + class name for every node. Only
+        # the visitors defined here, not the deprecated ones inherited from ast.NodeVisitor
+        self._dispatch = {
+            getattr(ast, name[len('visit_'):]): getattr(self, name)
+            for name in vars(StaticAnalyzer)
+            if name.startswith('visit_') and hasattr(ast, name[len('visit_'):])
+        }
+
+    def visit(self, node):
+        # Walk the tree with an explicit stack rather than recursing through generic_visit. Visitors
+        # only record their node, the children of every node are pushed here
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            visitor = self._dispatch.get(type(node))
+            if visitor is not None:
+                visitor(node)
+            stack.extend(ast.iter_child_nodes(node))
 
     def visit_ClassDef(self, node):
-        if isinstance(node, ast.ClassDef):
-            self.class_def.add(node.name)
-            for func in node.body:
-                if isinstance(func, ast.FunctionDef) or isinstance(func, ast.AsyncFunctionDef):
-                    self.function_def.add(node.name)
-                    for arg in node.args.args:
-                        self.function_param_def.add(arg.arg)
-        self.generic_visit(node)
+        self.class_def.add(node.name)
+        # Methods are recorded by visit_FunctionDef and visit_AsyncFunctionDef
 
     def visit_FunctionDef(self, node):
-        if isinstance(node, ast.FunctionDef):
-            self.function_def.add(node.name)
-            for arg in node.args.args:
-                self.function_param_def.add(arg.arg)
-        self.generic_visit(node)
+        self.function_def.add(node.name)
+        for arg in node.args.args:
+            self.function_param_def.add(arg.arg)
 
     def visit_AsyncFunctionDef(self, node):
-        if isinstance(node, ast.FunctionDef):
-            self.function_def.add(node.name)
-            for arg in node.args.args:
-                self.function_param_def.add(arg.arg)
-        self.generic_visit(node)
+        self.function_def.add(node.name)
+        for arg in node.args.args:
+            self.function_param_def.add(arg.arg)
 
     def visit_Assign(self, node):
-        if isinstance(node, ast.Assign):
-            for i, target in enumerate(node.targets):
-                target_dict = target.__dict__
-                if "elts" in target_dict:
-                    for elt in target_dict.get("elts"):
-                        self.assign_def.add(elt.id)
-                try:
-                    self.assign_def.add(node.value.elt.id)
-                except:
-                    pass
-                self.assign_def.add(target_dict.get("id"))
-        self.generic_visit(node)
+        # Element of a comprehension assigned as a whole, e.g. ``x = [i for i in ...]``
+        value_elt = getattr(node.value, 'elt', None)
+        for target in node.targets:
+            for elt in getattr(target, 'elts', ()):
+                if isinstance(elt, ast.Name):
+                    self.assign_def.add(elt.id)
+            if isinstance(value_elt, ast.Name):
+                self.assign_def.add(value_elt.id)
+            if isinstance(target, ast.Name):
+                self.assign_def.add(target.id)
 
     def visit_Import(self, node):
-        if isinstance(node, ast.Import):
-            for alias in node.names:
-                self.import_def.add(alias.name)
-        elif isinstance(node, ast.ImportFrom):
-            for alias in node.names:
-                self.alias_def.add(alias.name)
-            module = node.module
-            if module:
-                self.import_def.add(module)
-        self.generic_visit(node)
+        for alias in node.names:
+            self.import_def.add(alias.name)
 
     def visit_ImportFrom(self, node):
-        if isinstance(node, ast.ImportFrom):
-            for name in node.names:
-                self.import_def.add(node.module)
-                self.import_def.add(name.name)
-                self.alias_def.add(name.asname)
-        self.generic_visit(node)
+        for name in node.names:
+            self.import_def.add(node.module)
+            self.import_def.add(name.name)
+            self.alias_def.add(name.asname)
 
     def visit_With(self, node):
-        if isinstance(node, ast.With):
-            for item in node.items:
-                try:
-                    self.assign_def.add(item.optional_vars.id)
-                except:
-                    pass
-            self.generic_visit(node)
+        for item in node.items:
+            optional_vars = item.optional_vars
+            if isinstance(optional_vars, ast.Name):
+                self.assign_def.add(optional_vars.id)
 
     def visit_For(self, node):
-        if isinstance(node, ast.For):
-            try:
-                if isinstance(node.target, ast.Name):
-                    self.assign_def.add(node.target.id)
-                elif isinstance(node.target, ast.Tuple):
-                    # BFS (Might have Tuple inside tuple)
-                    queue = deque()
-                    for target in node.target.elts:
-                        queue.append(target)
-                    while len(queue) > 0:
-                        target = queue.popleft()
-                        if isinstance(target, ast.Name):
-                            self.assign_def.add(target.id)
-                        elif isinstance(target, ast.Tuple):
-                            for t in target.elts:
-                                queue.append(t)
-            except:
-                pass
-        self.generic_visit(node)
+        if isinstance(node.target, ast.Name):
+            self.assign_def.add(node.target.id)
+        elif isinstance(node.target, ast.Tuple):
+            # Might have Tuple inside tuple, the order names are collected in does not matter
+            stack = list(node.target.elts)
+            while stack:
+                target = stack.pop()
+                if isinstance(target, ast.Name):
+                    self.assign_def.add(target.id)
+                elif isinstance(target, ast.Tuple):
+                    stack.extend(target.elts)
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self.name_load.add(node.id)
 
     def visit_alias(self, node):
-        if isinstance(node, ast.alias):
-            self.alias_def.add(node.asname)
-        self.generic_visit(node)
+        self.alias_def.add(node.asname)
 
     def visit_Call(self, node):
-        if isinstance(node, ast.Call):
-            try:
-                func_name = node.func.id
-                self.func_call.add(func_name)
-                for arg in node.args:
+        if isinstance(node.func, ast.Name):
+            self.func_call.add(node.func.id)
+            for arg in node.args:
+                if isinstance(arg, ast.Name):
                     self.assign_def.add(arg.id)
-            except:
-                pass
-        self.generic_visit(node)
+
+
+@lru_cache(maxsize=256)
+def _parse_cached(code):
+    """Parse ``code``, shared by the analyses below. The returned tree must not be mutated."""
+    return ast.parse(code)
 
 
 def handle_missing_variables(code_buffer, cell_tag = None):
-    undefined_variables = set()
-    unimport_function = set()
-
-    def _visit_node_for_undefined_variables(node, analyzer):
-        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
-            variable_name = node.id
-
-            # Check if the variable is not defined locally and is not a function parameter
-            if variable_name not in analyzer.class_def and \
-                    variable_name not in analyzer.function_def and \
-                    variable_name not in analyzer.function_param_def and \
-                    variable_name not in analyzer.import_def and \
-                    variable_name not in analyzer.alias_def and \
-                    variable_name not in analyzer.assign_def and \
-                    variable_name not in __builtins__:
-                undefined_variables.add(variable_name)
+    return _declare_missing_variables(code_buffer)
+
 
+@lru_cache(maxsize=256)
+def _declare_missing_variables(code_buffer):
+    # Cached on the code alone, the same cell content under another tag is a cache hit
     try:
-        buffer_tree = ast.parse(code_buffer)
+        buffer_tree = _parse_cached(code_buffer)
+        # A single visit collects both the definitions and the loaded names
         analyzer = StaticAnalyzer()
         analyzer.visit(buffer_tree)
 
-        # Then, visit the tree again to collect undefined variables
-        for node in ast.walk(buffer_tree):
-            _visit_node_for_undefined_variables(node, analyzer)
-
-        # Visit for unimport function
-        for func_call in analyzer.func_call:
-            if func_call not in analyzer.function_def and \
-                    func_call not in analyzer.import_def and \
-                    func_call not in analyzer.alias_def and \
-                    func_call not in __builtins__:
-                unimport_function.add(func_call)
+        # Names defined locally, as function parameters, by imports or as builtins
+        known_names = analyzer.class_def | analyzer.function_def | analyzer.function_param_def | \
+            analyzer.import_def | analyzer.alias_def | analyzer.assign_def | _BUILTIN_NAMES
+        undefined_variables = analyzer.name_load - known_names
 
         if len(undefined_variables) != 0:
             new_code_buffer = "\n".join(f"{var} = None" for var in undefined_variables) + "\n\n" + code_buffer
@@ -162,82 +146,169 @@ def handle_missing_variables(code_buffer, cell_tag = None):
         raise SyntaxError(f"Syntax error in code: {e}")
 
 
+@lru_cache(maxsize=256)
 def _extract_imports(code):
     imports = []
 
-    def visit_node(node):
+    # Explicit depth first traversal, cheaper than the nested generators of ast.walk
+    stack = [_parse_cached(code)]
+    while stack:
+        node = stack.pop()
         if isinstance(node, ast.Import):
             for alias in node.names:
                 imports.append(alias.name)
+            continue
         elif isinstance(node, ast.ImportFrom):
-            sub_module = []
-            for alias in node.names:
-                sub_module.append(alias.name)
             module = node.module
             if module:
-                imports.append({module : sub_module})
-
-    tree = ast.parse(code)
-    for node in ast.walk(tree):
-        visit_node(node)
-
-    return imports
-
-
-def _find_missing_imports(code):
+                # ``from module import names`` as a (module, names) pair
+                imports.append((module, tuple(alias.name for alias in node.names)))
+            continue
+
+        children = []
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, ast.AST):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(item for item in value if isinstance(item, ast.AST))
+        # Reversed so that imports are collected in source order
+        stack.extend(reversed(children))
+
+    # Cached result is shared between callers, so it only holds strings and tuples
+    return tuple(imports)
+
+
+def _is_importable(name):
+    """Whether ``name`` resolves to a module, without executing it or its parent packages."""
+    try:
+        if name in sys.modules:
+            return True
+        parent, _, _ = name.rpartition('.')
+        if not parent:
+            # Top level lookups only consult the finders
+            return find_spec(name) is not None
+        # find_spec would import, and so execute, the parent packages of dotted names
+        search_locations = _submodule_search_locations(parent)
+        return search_locations is not None and PathFinder.find_spec(name, search_locations) is not None
+    except (ImportError, ValueError):
+        # Raised when a loaded module has no spec
+        return False
+
+
+def _submodule_search_locations(package):
+    """Where the submodules of ``package`` live, without importing it. None if it is not a package."""
+    module = sys.modules.get(package)
+    if module is not None:
+        return getattr(module, '__path__', None)
+    parent, _, _ = package.rpartition('.')
+    if parent:
+        search_locations = _submodule_search_locations(parent)
+        spec = PathFinder.find_spec(package, search_locations) if search_locations is not None else None
+    else:
+        spec = find_spec(package)
+    return spec.submodule_search_locations if spec is not None else None
+
+
+def _find_missing_imports(code, import_index):
     missing_imports = []
 
+    def is_importable(name):
+        # Resolved once per conversion, see find_files_containing_imports
+        importable = import_index.get(name)
+        if importable is None:
+            importable = import_index[name] = _is_importable(name)
+        return importable
+
     dependencies = _extract_imports(code)
 
     for dependency in dependencies:
-        try:
-            if isinstance(dependency, dict):
-                sub_module = list(dependency.keys())[0]
-                for sub in dependency[sub_module]:
-                    __import__(f"{sub_module}.{sub}")
-            else:
-                __import__(dependency)
-        except ImportError:
-            # If the import fails, add it to the list of missing imports
+        if isinstance(dependency, tuple):
+            sub_module, names = dependency
+            is_missing = not all(is_importable(f"{sub_module}.{sub}") for sub in names)
+        else:
+            is_missing = not is_importable(dependency)
+        if is_missing:
             missing_imports.append(dependency)
 
-    # Now you have a set of missing imports
     return missing_imports
 
 
-def find_files_containing_imports(code, project_directory):
+def _iter_python_files(project_directory):
+    """Yield the path of every python file under ``project_directory``, skipping ``_SKIPPED_DIRS``."""
+    pending_dirs = deque([project_directory])
+    while pending_dirs:
+        try:
+            entries = os.scandir(pending_dirs.popleft())
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in _SKIPPED_DIRS and 'venv' not in name:
+                        pending_dirs.append(entry.path)
+                elif name.endswith('.py') and entry.is_file():
+                    yield entry.path
+
+
+def _file_contains_any(file_path, names):
+    """Whether the file contains any of the encoded ``names``, scanned through the OS page cache."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return any(mm.find(name) != -1 for name in names)
+
+
+def find_files_containing_imports(code, project_directory, file_index=None, import_index=None):
+    """Find the project files providing the imports of ``code`` that cannot be resolved.
+
+    ``file_index`` and ``import_index`` are optional dicts, owned by the caller, caching the python
+    files of each walked project directory and whether each module name could be imported. Share
+    them across the cells of a single conversion, and start new ones to see what changed since.
+    """
     matching_files = set()
-    visited_files = set()
-
-    def search_files(code_buffer, curr_file):
-        if curr_file in visited_files or \
-            'venv' in curr_file or \
-                curr_file.split('.')[-1] != 'py':
-            return
-
-        visited_files.add(curr_file)
-        missing_imports = _find_missing_imports(code_buffer)
-        with open(curr_file, 'r') as f:
-            file_content = f.read()
-            for missing_import in missing_imports:
-                if isinstance(missing_import, dict):
-                    sub_module = list(missing_import.keys())[0]
-                    import_module = '/'.join(sub_module.split(".")) + '.py'
-                    for func in missing_import[sub_module]:
-                        if import_module in curr_file and func in file_content:
-                            matching_files.add(curr_file)
-                            return
-                else:
-                    if missing_import in curr_file:
-                        matching_files.add(curr_file)
-                        return
-
-                next_curr_dir = os.path.dirname(curr_file)
-                search_files(file_content, next_curr_dir)
-
-    for root, dirs, files in os.walk(project_directory):
-        for file in files:
-            file_path = os.path.join(root, file)
-            search_files(code, file_path)
+
+    # The imports of ``code`` do not depend on the file being searched, resolve them once
+    missing_imports = _find_missing_imports(code, {} if import_index is None else import_index)
+    if not missing_imports:
+        return matching_files
+
+    # Plain imports only need to appear in the file path, ``from module import name`` imports also
+    # need one of the imported names in the content of the module file
+    imported_modules = []
+    imported_names = []
+    for missing_import in missing_imports:
+        if isinstance(missing_import, tuple):
+            sub_module, names = missing_import
+            import_module = sub_module.replace('.', '/') + '.py'
+            imported_names.append((import_module, [func.encode() for func in names]))
+        else:
+            imported_modules.append(missing_import)
+
+    def search_files(curr_file):
+        if any(missing_import in curr_file for missing_import in imported_modules):
+            return True
+
+        searched_names = []
+        for import_module, names in imported_names:
+            if import_module in curr_file:
+                searched_names.extend(names)
+        # Only open the files whose path can match a missing module
+        return bool(searched_names) and _file_contains_any(curr_file, searched_names)
+
+    if file_index is None:
+        python_files = _iter_python_files(project_directory)
+    else:
+        python_files = file_index.get(project_directory)
+        if python_files is None:
+            python_files = file_index[project_directory] = tuple(_iter_python_files(project_directory))
+    # Every python file is visited once, no need to recurse into parent directories
+    for file_path in python_files:
+        if search_files(file_path):
+            matching_files.add(file_path)
 
     return matching_files
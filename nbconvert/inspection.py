@@ -1,6 +1,9 @@
+import logging
+from functools import lru_cache
 from pathlib import Path
 
 import click
+import nbformat
 
 from nbconvert.iorw import get_pretty_path, load_notebook_node, local_file_io_cwd
 from nbconvert.log import logger
@@ -12,7 +15,8 @@ from nbconvert.utils import any_tagged_cell, find_first_tagged_cell_index, nb_ke
 def _open_notebook(notebook_path, parameters):
     path_parameters = add_builtin_parameters(parameters)
     input_path = parameterize_path(notebook_path, path_parameters)
-    logger.info(f"Input Notebook:  {get_pretty_path(input_path)}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Input Notebook:  %s", get_pretty_path(input_path))
 
     with local_file_io_cwd():
         return load_notebook_node(input_path)
@@ -43,13 +47,32 @@ def _infer_parameters(nb, name=None, language=None):
 
     translator = nbconvert_translators.find_translator(kernel_name, language)
     try:
-        params = translator.inspect(parameter_cell)
+        params = list(_inspect_parameters_source(translator, parameter_cell.source))
     except NotImplementedError:
-        logger.warning(f"Translator for '{language}' language does not support parameter introspection.")
+        logger.warning("Translator for '%s' language does not support parameter introspection.", language)
 
     return params
 
 
+@lru_cache(maxsize=32)
+def _inspect_parameters_source(translator, source):
+    """Inspect a parameters cell source, cached since batches of notebooks often share it.
+
+    Parameters
+    ----------
+    translator : Translator
+        Translator resolved for the notebook kernel and language
+    source : str
+        Source of the cell tagged _parameters_
+
+    Returns
+    -------
+    Tuple[Parameter]
+       Parameters inferred by the translator
+    """
+    return tuple(translator.inspect(nbformat.v4.new_code_cell(source)))
+
+
 def display_notebook_help(ctx, notebook_path, parameters):
     """Display help on notebook parameters.
 
@@ -1,9 +1,10 @@
-import fnmatch
 import json
 import os
 import sys
+import threading
 import warnings
 from contextlib import contextmanager
+from functools import lru_cache
 
 import entrypoints
 import nbformat
@@ -65,6 +66,12 @@ try:
 except NameError:
     FileNotFoundError = IOError
 
+try:
+    # Prefer the libyaml C backend when PyYAML was built against it
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 
 class NBConvertIO:
     '''
@@ -77,10 +84,8 @@ class NBConvertIO:
         self.reset()
 
     def read(self, path, extensions=['.ipynb', '.json', 'py']):
-        notebook_metadata = self.get_handler(path, extensions).read(path)
-        if isinstance(notebook_metadata, (bytes, bytearray)):
-            return notebook_metadata.decode('utf-8')
-        return notebook_metadata
+        # Handlers return text, the ones reading bytes from their backend decode them
+        return self.get_handler(path, extensions).read(path)
 
     def write(self, buf, path, extensions=['.ipynb', '.json', 'py']):
         return self.get_handler(path, extensions).write(buf, path)
@@ -93,10 +98,29 @@ class NBConvertIO:
 
     def reset(self):
         self._handlers = []
+        # Handlers indexed by the scheme part up to '://', each bucket ordered LIFO like _handlers
+        self._scheme_handlers = {}
+        # Handlers registered without '://' (e.g. 'local', '-'), ordered LIFO
+        self._bare_handlers = []
+        self._local_handler = None
+        # Per instance caches, so that they are dropped along with the registered handlers
+        self._resolve_handler_cached = lru_cache(maxsize=128)(self._resolve_handler)
+        self._check_extensions_once = lru_cache(maxsize=128)(self._check_extensions)
 
     def register(self, scheme, handler):
         # Keep these ordered as LIFO
         self._handlers.insert(0, (scheme, handler))
+        # The registration order decides between a bucketed and a bare scheme matching the same path
+        entry = (len(self._handlers), scheme, handler)
+        prefix, sep, _ = scheme.partition('://')
+        if sep:
+            self._scheme_handlers.setdefault(prefix + sep, []).insert(0, entry)
+        else:
+            self._bare_handlers.insert(0, entry)
+        if scheme == 'local' and self._local_handler is None:
+            # The first registered local handler is the fallback
+            self._local_handler = handler
+        self._resolve_handler_cached.cache_clear()
 
     def register_entry_points(self):
         # Load handlers provided by other packages
@@ -128,24 +152,47 @@ class NBConvertIO:
         if isinstance(path, nbformat.NotebookNode):
             return NotebookNodeHandler()
 
-        if extensions:
-            if not fnmatch.fnmatch(os.path.basename(path).split('?')[0], '*.*'):
-                warnings.warn(f"the file is not specified with any extension : {os.path.basename(path)}")
-            elif not any(fnmatch.fnmatch(os.path.basename(path).split('?')[0], f"*{ext}") for ext in extensions):
-                warnings.warn(f"The specified file ({path}) does not end in one of {extensions}")
-
-        local_handler = None
-        for scheme, handler in self._handlers:
-            if scheme == 'local':
-                local_handler = handler
+        if path.startswith('{') or '\n' in path:
+            # A whole notebook passed as a JSON string, keep such bodies out of the caches
+            if extensions:
+                self._check_extensions(path, tuple(extensions))
+            return self._resolve_handler(path)
 
-            if path.startswith(scheme):
-                return handler
-
-        if local_handler is None:
+        if extensions:
+            # Only warns the first time a path is checked against the same extensions
+            self._check_extensions_once(path, tuple(extensions))
+
+        return self._resolve_handler_cached(path)
+
+    def _check_extensions(self, path, extensions):
+        basename = os.path.basename(path)
+        basename_noquery = basename.split('?', 1)[0]
+        if '.' not in basename_noquery:
+            warnings.warn(f"the file is not specified with any extension : {basename}")
+        elif not basename_noquery.endswith(extensions):
+            warnings.warn(f"The specified file ({path}) does not end in one of {list(extensions)}")
+
+    def _resolve_handler(self, path):
+        # Only the schemes sharing the path's 'prefix://' can match, no need to scan every handler
+        match = None
+        prefix, sep, _ = path.partition('://')
+        for entry in self._scheme_handlers.get(prefix + sep, ()) if sep else ():
+            if path.startswith(entry[1]):
+                match = entry
+                break
+        for entry in self._bare_handlers:
+            if match is not None and entry[0] < match[0]:
+                break
+            if path.startswith(entry[1]):
+                match = entry
+                break
+        if match is not None:
+            return match[2]
+
+        if self._local_handler is None:
             raise NBConvertlException(f"Could not find a registered schema handler for: {path}")
 
-        return local_handler
+        return self._local_handler
 
 
 class HttpHandler:
@@ -193,8 +240,9 @@ class LocalHandler:
     def write(self, buf, path):
         with chdir(self._cwd):
             dirname = os.path.dirname(path)
-            if dirname and not os.path.exists(dirname):
-                os.mkdir(dirname)
+            if dirname:
+                # Also safe when a concurrent write creates the directory in the meantime
+                os.makedirs(dirname, exist_ok=True)
             with open(path, 'w', encoding="utf-8") as f:
                 f.write(buf)
 
@@ -209,30 +257,42 @@ class LocalHandler:
 
 
 class S3Handler:
-    @classmethod
-    def read(cls, path):
-        return "\n".join(S3().read(path))
+    def __init__(self):
+        self._client = None
+        self._client_lock = threading.Lock()
 
-    @classmethod
-    def listdir(cls, path):
-        return S3().listdir(path)
+    def _get_client(self):
+        if self._client is None:
+            # Writes may run from several threads, only one of them creates the client
+            with self._client_lock:
+                if self._client is None:
+                    self._client = S3()
+        return self._client
 
-    @classmethod
-    def write(cls, buf, path):
-        return S3().cp_string(buf, path)
+    def read(self, path):
+        return "\n".join(self._get_client().read(path))
 
-    @classmethod
-    def pretty_path(cls, path):
+    def listdir(self, path):
+        return self._get_client().listdir(path)
+
+    def write(self, buf, path):
+        return self._get_client().cp_string(buf, path)
+
+    def pretty_path(self, path):
         return path
 
 
 class ABSHandler:
     def __init__(self):
         self._client = None
+        self._client_lock = threading.Lock()
 
     def _get_client(self):
         if self._client is None:
-            self._client = AzureBlobStore()
+            # Writes may run from several threads, only one of them creates the client
+            with self._client_lock:
+                if self._client is None:
+                    self._client = AzureBlobStore()
         return self._client
 
     def read(self, path):
@@ -257,14 +317,18 @@ class GCSHandler:
 
     def __init__(self):
         self._client = None
+        self._client_lock = threading.Lock()
 
     def _get_client(self):
         if self._client is None:
-            self._client = GCSFileSystem()
+            # Writes may run from several threads, only one of them creates the client
+            with self._client_lock:
+                if self._client is None:
+                    self._client = GCSFileSystem()
         return self._client
 
     def read(self, path):
-        with self._get_client().open(path) as f:
+        with self._get_client().open(path, 'r', encoding='utf-8') as f:
             return f.read()
 
     def listdir(self, path):
@@ -319,7 +383,7 @@ class GithubHandler:
         sub_path = '/'.join(splits[7:])
         repo = self._get_client().get_repo(f"{org_id}/{repo_id}")
         content = repo.get_contents(sub_path, ref=ref_id)
-        return content.decoded_content
+        return content.decoded_content.decode('utf-8')
 
     def listdir(self, path):
         raise NBConvertlException('listdir is not supported by GithubHandler')
@@ -382,18 +446,18 @@ class NoIOHandler:
         return 'Notebook will not be saved'
 
 
-class NoDatesSafeLoader(yaml.SafeLoader):
+class NoDatesSafeLoader(_SafeLoader):
     yaml_implicit_resolvers = {
         k: [r for r in v if r[0] != 'tag:yaml.org,2002:timestamp']
-        for k, v in yaml.SafeLoader.yaml_implicit_resolvers.items()
+        for k, v in _SafeLoader.yaml_implicit_resolvers.items()
     }
 
 
 # Instantiate a NBConvertIO instance and register Handlers.
 nbconvert_io = NBConvertIO()
 nbconvert_io.register("local", LocalHandler())
-nbconvert_io.register("s3://", S3Handler)
-nbconvert_io.register("minio://", S3Handler)
+nbconvert_io.register("s3://", S3Handler())
+nbconvert_io.register("minio://", S3Handler())
 nbconvert_io.register("gs://", GCSHandler())
 nbconvert_io.register("abs://", ABSHandler())
 nbconvert_io.register("http://github.com/", GithubHandler())
@@ -432,11 +496,15 @@ def load_notebook_node(notebook_path):
 
     """
     nb = nbformat.reads(nbconvert_io.read(notebook_path), as_version=4)
-    nb_upgraded = nbformat.v4.upgrade(nb)
-    if nb_upgraded is not None:
-        nb = nb_upgraded
-
-    if not hasattr(nb.metadata, 'nbconvert'):
+    # Notebooks already at the current minor version are returned unchanged by the upgrade
+    if nb.get('nbformat_minor') != nbformat.v4.nbformat_minor:
+        nb_upgraded = nbformat.v4.upgrade(nb)
+        if nb_upgraded is not None:
+            nb = nb_upgraded
+
+    # Key lookups rather than hasattr, which raises and catches an AttributeError for every missing
+    # key. The plain assignments (instead of setdefault) convert the dicts into NotebookNodes
+    if 'nbconvert' not in nb.metadata:
         nb.metadata['nbconvert'] = {
             'default_parameters': dict(),
             'parameters': dict(),
@@ -445,11 +513,12 @@ def load_notebook_node(notebook_path):
         }
 
     for cell in nb.cells:
-        if not hasattr(cell.metadata, 'tags'):
-            cell.metadata['tags'] = []  # Create tags attr if one doesn't exist.
+        cell_metadata = cell.metadata
+        if 'tags' not in cell_metadata:
+            cell_metadata['tags'] = []  # Create tags attr if one doesn't exist.
 
-        if not hasattr(cell.metadata, 'nbconvert'):
-            cell.metadata['nbconvert'] = dict()
+        if 'nbconvert' not in cell_metadata:
+            cell_metadata['nbconvert'] = dict()
 
     return nb
 
@@ -463,6 +532,10 @@ def get_pretty_path(path):
     return nbconvert_io.pretty_path(path)
 
 
+def get_handler(path, extensions=None):
+    return nbconvert_io.get_handler(path, extensions)
+
+
 @contextmanager
 def local_file_io_cwd(path=None):
     try:
@@ -0,0 +1,15 @@
+import pytest
+
+from nbconvert.iorw import load_notebook_node
+from nbconvert.tests import get_notebook_path
+
+
+# Parsed once per test session, the tests using these notebooks must not modify them
+@pytest.fixture(scope="session")
+def simple_execution_nb():
+    return load_notebook_node(get_notebook_path('simple_execution.ipynb'))
+
+
+@pytest.fixture(scope="session")
+def simple_execute_nb():
+    return load_notebook_node(get_notebook_path('simple_execute.ipynb'))
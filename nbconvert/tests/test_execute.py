@@ -0,0 +1,94 @@
+import os
+import threading
+
+import nbformat
+import pytest
+
+from nbconvert import execute
+from nbconvert.execute import execute_notebook
+
+KERNELSPEC = {'name': 'python3', 'language': 'python', 'display_name': 'python3'}
+
+
+def _tagged_cell(source, tag):
+    cell = nbformat.v4.new_code_cell(source)
+    cell.metadata['tags'] = [tag]
+    return cell
+
+
+@pytest.fixture()
+def project_dir(tmp_path, monkeypatch):
+    project_dir = tmp_path / 'project'
+    project_dir.mkdir()
+    (project_dir / 'utils.py').write_text('def import_func():\n    pass\n')
+    monkeypatch.setenv('ROOT_PROJECT_DIR', str(project_dir))
+    return project_dir
+
+
+def test_cell_module_wins_over_copied_module(tmp_path, project_dir, monkeypatch):
+    nb = nbformat.v4.new_notebook(metadata={'kernelspec': KERNELSPEC})
+    nb.cells = [
+        _tagged_cell('from utils import import_func\nimport_func()', 'a'),
+        _tagged_cell('y = 1', 'utils'),
+    ]
+    input_path = str(tmp_path / 'input.ipynb')
+    nbformat.write(nb, input_path)
+
+    write_py, copy_py = execute.write_py, execute._copy_py
+    cell_module_written = threading.Event()
+
+    def tracking_write_py(buf, path):
+        write_py(buf, path)
+        if path.endswith('/utils.py'):
+            cell_module_written.set()
+
+    def late_copy_py(file_path, output_path):
+        # Finish the copy only after the cell module write, as a slow filesystem could
+        cell_module_written.wait(timeout=5)
+        copy_py(file_path, output_path)
+
+    monkeypatch.setattr(execute, 'write_py', tracking_write_py)
+    monkeypatch.setattr(execute, '_copy_py', late_copy_py)
+
+    artifacts_dir = execute_notebook(input_path, str(tmp_path / 'output'), parameters_specified=())
+
+    assert sorted(os.listdir(artifacts_dir)) == ['a.py', 'utils.py']
+    with open(os.path.join(artifacts_dir, 'utils.py')) as f:
+        assert 'y = 1' in f.read()
+
+
+def test_stream_artifacts_are_written_in_order(tmp_path, monkeypatch, capsysbinary):
+    cell_tags = [f'cell_{i}' for i in range(12)]
+    nb = nbformat.v4.new_notebook(metadata={'kernelspec': KERNELSPEC})
+    nb.cells = [_tagged_cell(f'print({i})', cell_tag) for i, cell_tag in enumerate(cell_tags)]
+    input_path = str(tmp_path / 'input.ipynb')
+    nbformat.write(nb, input_path)
+
+    write_py = execute.write_py
+    writes = []
+
+    def recording_write_py(buf, path):
+        writes.append((path.rsplit('/', 1)[-1], threading.current_thread()))
+        write_py(buf, path)
+
+    monkeypatch.setattr(execute, 'write_py', recording_write_py)
+
+    execute_notebook(input_path, '-', parameters_specified=())
+
+    assert writes == [(f'{cell_tag}.py', threading.main_thread()) for cell_tag in cell_tags]
+    output = capsysbinary.readouterr().out.decode('utf-8')
+    positions = [output.index(f'def {cell_tag}():') for cell_tag in cell_tags]
+    assert positions == sorted(positions)
+
+
+def test_unknown_parameters_are_reported_in_order(tmp_path, caplog):
+    nb = nbformat.v4.new_notebook(metadata={'kernelspec': KERNELSPEC})
+    nb.cells = [_tagged_cell('a = 1', 'parameters')]
+    input_path = str(tmp_path / 'input.ipynb')
+    nbformat.write(nb, input_path)
+
+    parameters = {'zeta': 1, 'a': 2, 'alpha': 3, 'mu': 4, 'beta': 5}
+    execute_notebook(input_path, str(tmp_path / 'output'), parameters=parameters)
+
+    unknown = [record.args[0] for record in caplog.records if record.msg == "Passed unknown parameter: %s"]
+    assert unknown == ['zeta', 'alpha', 'mu', 'beta']
@@ -1,72 +1,207 @@
+import importlib
 import os
+import sys
 import unittest
+from tempfile import TemporaryDirectory
 
-from nbconvert.execute import prepare_notebook_cell
+import black
+import pytest
+
+from nbconvert.execute import BLACK_MODE, format_cell_buffers, prepare_notebook_cell
 from nbconvert.format import (
     handle_missing_variables,
     find_files_containing_imports
 )
-from nbconvert.iorw import load_notebook_node
-from nbconvert.tests import get_notebook_path
 
 
 class TestHandleMissingVariables(unittest.TestCase):
-    def setUp(self):
-        self.notebook_name = 'simple_execution.ipynb'
-        self.notebook_path = get_notebook_path(self.notebook_name)
-        self.nb = load_notebook_node(self.notebook_path)
+    @pytest.fixture(autouse=True)
+    def _notebook(self, simple_execution_nb):
+        self.nb = simple_execution_nb
 
     def test_handle_variable(self):
-        buffer = prepare_notebook_cell(self.nb, ['valid_variable'])
-        code_content = ""
-        for _, cell_content in buffer.items():
-            code_content += cell_content
+        code_content = ''.join(prepare_notebook_cell(self.nb, ['valid_variable']).values())
 
         code_content = handle_missing_variables(code_content)
         assert code_content == 'def valid_variable():\n\tx = 0\n\tfor i in range(10):\n\t    x += i\n\t\n\tprint(x)\n'
 
     def test_handle_missing_variable(self):
-        buffer = prepare_notebook_cell(self.nb, ['invalid_variable'])
-        code_content = ""
-        for _, cell_content in buffer.items():
-            code_content += cell_content
+        code_content = ''.join(prepare_notebook_cell(self.nb, ['invalid_variable']).values())
 
         code_content = handle_missing_variables(code_content)
         assert code_content == 'def invalid_variable():\n\tfor i in range(10):\n\t    x += i\n\t\n\tprint(x)\n'
 
     def test_handle_complex_variable(self):
-        buffer = prepare_notebook_cell(self.nb, ['complex_variable'])
-        code_content = ""
-        for _, cell_content in buffer.items():
-            code_content += cell_content
+        code_content = ''.join(prepare_notebook_cell(self.nb, ['complex_variable']).values())
 
         code_content = handle_missing_variables(code_content)
         print({"loz": code_content})
         assert code_content == "def complex_variable():\n\tfor (a, b) in range(10):\n\t    print(a, b)\n\t\n\ti = 0\n\twhile i < 10:\n\t    i += 1\n\t\n\twith open('utils.py') as f:\n\t    f.read()\n"
 
+    def test_handle_builtin_names(self):
+        code_content = 'def builtins_only():\n\treturn sorted(len(s) for s in map(str, range(3)))\n'
+        assert handle_missing_variables(code_content) == code_content
+
+    def test_handle_class_and_async_definitions(self):
+        code_content = (
+            'class Greeter:\n\tdef greet(self, name):\n\t\treturn name\n\n'
+            'async def fetch(url):\n\treturn url\n\n'
+            'print(Greeter().greet(fetch))\n'
+        )
+        assert handle_missing_variables(code_content) == code_content
+
+
+class TestFormatCellBuffers(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _notebook(self, simple_execution_nb):
+        self.nb = simple_execution_nb
+
+    def test_format_is_split_per_cell(self):
+        cell_tags = ['valid_variable', 'invalid_variable', 'complex_variable']
+        buffer = prepare_notebook_cell(self.nb, cell_tags)
+
+        formatted = format_cell_buffers(buffer, config={})
+
+        assert list(formatted) == cell_tags
+        for cell_tag in cell_tags:
+            expected = black.format_str(handle_missing_variables(buffer[cell_tag], cell_tag), mode=BLACK_MODE)
+            assert formatted[cell_tag] == expected
+
+    def test_format_cell_containing_separator(self):
+        buffer = {
+            'valid_variable': 'def valid_variable():\n\tx = 1\n\n\n#__NBCONVERT_SEP__ other\ny = 2\n',
+            'other': 'def other():\n\tz = 3\n',
+        }
+
+        formatted = format_cell_buffers(buffer, config={})
+
+        assert list(formatted) == ['valid_variable', 'other']
+        for cell_tag in buffer:
+            expected = black.format_str(handle_missing_variables(buffer[cell_tag], cell_tag), mode=BLACK_MODE)
+            assert formatted[cell_tag] == expected
+
+    def test_format_empty(self):
+        assert format_cell_buffers({}, config={}) == {}
+
 
 class TestFindMissingImports(unittest.TestCase):
-    def setUp(self):
-        self.notebook_name = 'simple_execution.ipynb'
-        self.notebook_path = get_notebook_path(self.notebook_name)
-        self.nb = load_notebook_node(self.notebook_path)
+    @pytest.fixture(autouse=True)
+    def _notebook(self, simple_execution_nb):
+        self.nb = simple_execution_nb
         self.cwd = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'notebooks')
 
     def test_no_missing_imports(self):
-        buffer = prepare_notebook_cell(self.nb, ['valid_variable'])
-        code_content = ""
-        for _, cell_content in buffer.items():
-            code_content += cell_content
+        code_content = ''.join(prepare_notebook_cell(self.nb, ['valid_variable']).values())
 
         missing_imports_path = find_files_containing_imports(code_content, self.cwd)
 
         assert missing_imports_path == set()
 
     def test_has_missing_imports(self):
-        buffer = prepare_notebook_cell(self.nb, ['missing_import'])
-        code_content = ""
-        for _, cell_content in buffer.items():
-            code_content += cell_content
+        code_content = ''.join(prepare_notebook_cell(self.nb, ['missing_import']).values())
 
         missing_imports_path = find_files_containing_imports(code_content, self.cwd)
         assert missing_imports_path == {self.cwd + '/utils.py'}
+
+    def test_missing_imports_skip_ignored_directories(self):
+        code_content = 'def missing_import():\n\tfrom utils import import_func\n\timport_func()\n'
+        with TemporaryDirectory() as project_dir:
+            for sub_dir in ('', '.venv', '__pycache__'):
+                os.makedirs(os.path.join(project_dir, sub_dir), exist_ok=True)
+                with open(os.path.join(project_dir, sub_dir, 'utils.py'), 'w') as f:
+                    f.write('def import_func():\n    pass\n')
+            # Candidate module without the imported name, empty files cannot be memory mapped
+            os.makedirs(os.path.join(project_dir, 'empty'))
+            open(os.path.join(project_dir, 'empty', 'utils.py'), 'w').close()
+
+            missing_imports_path = find_files_containing_imports(code_content, project_dir)
+            assert missing_imports_path == {os.path.join(project_dir, 'utils.py')}
+
+    def test_missing_imports_see_new_files(self):
+        code_content = 'def missing_import():\n\tfrom utils import import_func\n\timport_func()\n'
+        with TemporaryDirectory() as project_dir:
+            assert find_files_containing_imports(code_content, project_dir) == set()
+
+            utils_path = os.path.join(project_dir, 'utils.py')
+            with open(utils_path, 'w') as f:
+                f.write('def import_func():\n    pass\n')
+            assert find_files_containing_imports(code_content, project_dir) == {utils_path}
+
+    def test_missing_imports_share_file_index(self):
+        code_content = 'def missing_import():\n\tfrom utils import import_func\n\timport_func()\n'
+        with TemporaryDirectory() as project_dir:
+            file_index = {}
+            assert find_files_containing_imports(code_content, project_dir, file_index) == set()
+            assert file_index == {project_dir: ()}
+
+            utils_path = os.path.join(project_dir, 'utils.py')
+            with open(utils_path, 'w') as f:
+                f.write('def import_func():\n    pass\n')
+            # The walked files are reused for the other cells of the same conversion
+            assert find_files_containing_imports(code_content, project_dir, file_index) == set()
+            assert find_files_containing_imports(code_content, project_dir, {}) == {utils_path}
+
+    def test_missing_imports_follow_sys_path(self):
+        code_content = 'def missing_import():\n\timport sys_path_helper\n\tsys_path_helper.helper_func()\n'
+        with TemporaryDirectory() as project_dir:
+            helper_path = os.path.join(project_dir, 'sys_path_helper.py')
+            with open(helper_path, 'w') as f:
+                f.write('def helper_func():\n    pass\n')
+            assert find_files_containing_imports(code_content, project_dir) == {helper_path}
+
+            # Once the project is importable, the module no longer needs to be copied
+            sys.path.insert(0, project_dir)
+            importlib.invalidate_caches()
+            try:
+                assert find_files_containing_imports(code_content, project_dir) == set()
+            finally:
+                sys.path.remove(project_dir)
+
+    def test_missing_imports_do_not_execute_modules(self):
+        code_content = (
+            'def missing_import():\n'
+            '\tfrom side_effect_module import side_effect_func\n'
+            '\tfrom side_effect_package import side_effect_submodule\n'
+            '\tside_effect_func(side_effect_submodule)\n'
+        )
+        with TemporaryDirectory() as project_dir:
+            module_path = os.path.join(project_dir, 'side_effect_module.py')
+            with open(module_path, 'w') as f:
+                f.write('raise RuntimeError("executed")\ndef side_effect_func(module):\n    pass\n')
+            os.makedirs(os.path.join(project_dir, 'side_effect_package'))
+            with open(os.path.join(project_dir, 'side_effect_package', '__init__.py'), 'w') as f:
+                f.write('raise RuntimeError("executed")\n')
+            open(os.path.join(project_dir, 'side_effect_package', 'side_effect_submodule.py'), 'w').close()
+
+            sys.path.insert(0, project_dir)
+            importlib.invalidate_caches()
+            try:
+                # Only the imported function is missing, it is not a module of its own
+                assert find_files_containing_imports(code_content, project_dir) == {module_path}
+            finally:
+                sys.path.remove(project_dir)
+            assert 'side_effect_module' not in sys.modules
+            assert 'side_effect_package' not in sys.modules
+
+    def test_missing_imports_see_installed_modules(self):
+        code_content = 'def missing_import():\n\timport late_helper\n\tlate_helper.helper_func()\n'
+        with TemporaryDirectory() as project_dir, TemporaryDirectory() as site_dir:
+            helper_path = os.path.join(project_dir, 'late_helper.py')
+            with open(helper_path, 'w') as f:
+                f.write('def helper_func():\n    pass\n')
+
+            sys.path.insert(0, site_dir)
+            try:
+                import_index = {}
+                assert find_files_containing_imports(code_content, project_dir, import_index=import_index) == {
+                    helper_path
+                }
+                assert import_index == {'late_helper': False}
+
+                # Installed once the first conversion is done, the next one no longer copies it
+                with open(os.path.join(site_dir, 'late_helper.py'), 'w') as f:
+                    f.write('def helper_func():\n    pass\n')
+                importlib.invalidate_caches()
+                assert find_files_containing_imports(code_content, project_dir) == set()
+            finally:
+                sys.path.remove(site_dir)
@@ -5,7 +5,7 @@ import pytest
 from click import Context
 
 from nbconvert.exceptions import NBConvertlException
-from nbconvert.inspection import display_notebook_help, inspect_notebook
+from nbconvert.inspection import _inspect_parameters_source, display_notebook_help, inspect_notebook
 
 NOTEBOOKS_PATH = Path(__file__).parent / "notebooks"
 
@@ -60,6 +60,15 @@ def test_str_path():
     assert inspect_notebook(str(_get_fullpath("simple_execute.ipynb"))) == expected
 
 
+def test_inspection_is_cached():
+    _inspect_parameters_source.cache_clear()
+    first = inspect_notebook(_get_fullpath("complex_parameters.ipynb"))
+    second = inspect_notebook(_get_fullpath("complex_parameters.ipynb"))
+
+    assert first == second
+    assert _inspect_parameters_source.cache_info().hits == 1
+
+
 @pytest.mark.parametrize(
     "name, expected",
     [
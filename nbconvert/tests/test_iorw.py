@@ -26,6 +26,7 @@ from nbconvert.iorw import (
 from nbconvert.tests import get_notebook_path
 
 FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+NOTEBOOKNODE_IO_PATH = get_notebook_path('test_notebooknode_io.ipynb')
 
 
 class TestNBConvertIO(unittest.TestCase):
@@ -96,7 +97,7 @@ class TestNBConvertIO(unittest.TestCase):
         self.assertIsInstance(self.nbconvert_io.get_handler(None), NoIOHandler)
 
     def test_get_notebook_node_handler(self):
-        test_nb = nbformat.read(get_notebook_path('test_notebooknode_io.ipynb'), as_version=4)
+        test_nb = nbformat.read(NOTEBOOKNODE_IO_PATH, as_version=4)
         self.assertIsInstance(self.nbconvert_io.get_handler(test_nb), NotebookNodeHandler)
 
     def test_entrypoint_register(self):
@@ -122,6 +123,37 @@ class TestNBConvertIO(unittest.TestCase):
         # Should match fake2 with fake2 path
         self.assertEqual(self.nbconvert_io.get_handler("fake2/path"), self.fake2)
 
+    def test_register_ordering_with_scheme_prefix(self):
+        self.nbconvert_io.reset()
+        self.nbconvert_io.register("https://", self.fake1)
+        self.nbconvert_io.register("https://github.com/", self.fake2)
+        self.assertEqual(self.nbconvert_io.get_handler("https://github.com/org/repo"), self.fake2)
+        self.assertEqual(self.nbconvert_io.get_handler("https://example.com/nb.ipynb"), self.fake1)
+
+        # Bare schemes registered later still take precedence, as with a LIFO scan
+        self.nbconvert_io.register("http", self.fake1)
+        self.assertEqual(self.nbconvert_io.get_handler("https://github.com/org/repo"), self.fake1)
+
+    def test_register_invalidates_cached_handler(self):
+        self.assertEqual(self.nbconvert_io.get_handler("fake2/path"), self.fake1)
+        self.nbconvert_io.register("fake2", self.fake2)
+        self.assertEqual(self.nbconvert_io.get_handler("fake2/path"), self.fake2)
+
+    def test_notebook_json_is_not_cached(self):
+        self.nbconvert_io.register("local", self.fake2)
+        notebook_json = json.dumps(nbformat.v4.new_notebook(), indent=1)
+        with pytest.warns(UserWarning):
+            self.assertEqual(self.nbconvert_io.get_handler(notebook_json, extensions=('.ipynb',)), self.fake2)
+        self.assertEqual(self.nbconvert_io._resolve_handler_cached.cache_info().currsize, 0)
+        self.assertEqual(self.nbconvert_io._check_extensions_once.cache_info().currsize, 0)
+
+    def test_extension_warning_is_issued_once(self):
+        with pytest.warns(UserWarning):
+            self.nbconvert_io.read("fake/path/fakeinputpath.ipynb1")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            self.nbconvert_io.read("fake/path/fakeinputpath.ipynb1")
+
     def test_read(self):
         self.assertEqual(self.nbconvert_io.read("fake/path"), "contents from fake/path for version 1")
 
@@ -186,8 +218,11 @@ class TestLocalHandler(unittest.TestCase):
                 self.assertEqual(f.read().strip(), '✄')
 
     def test_write_no_directory_exists(self):
-        with self.assertRaises(FileNotFoundError):
-            LocalHandler().write("buffer", "fake/path/fakenb.ipynb")
+        with TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'fake', 'path', 'fakenb.ipynb')
+            LocalHandler().write("buffer", path)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), "buffer")
 
     def test_write_local_directory(self):
         with patch.object(io, 'open'):
@@ -334,7 +369,7 @@ class TestStreamHandler(unittest.TestCase):
 
 class TestNotebookNodeHandler(unittest.TestCase):
     def test_read_notebook_node(self):
-        input_nb = nbformat.read(get_notebook_path('test_notebooknode_io.ipynb'), as_version=4)
+        input_nb = nbformat.read(NOTEBOOKNODE_IO_PATH, as_version=4)
         result = NotebookNodeHandler().read(input_nb)
         expect = (
             '{\n "cells": [\n  {\n   "cell_type": "code",\n   "execution_count": null,'
@@ -6,6 +6,8 @@ from nbconvert.iorw import load_notebook_node
 from nbconvert.parameterize import add_builtin_parameters, parameterize_notebook, parameterize_path
 from nbconvert.tests import get_notebook_path
 
+SIMPLE_EXECUTE_PATH = get_notebook_path("simple_execute.ipynb")
+
 
 class TestNotebookParametrizing(unittest.TestCase):
     def count_nb_injected_parameter_cells(self, nb):
@@ -13,7 +15,7 @@ class TestNotebookParametrizing(unittest.TestCase):
 
     def test_no_tag_copying(self):
         # Test that injected cell does not copy other tags
-        test_nb = load_notebook_node(get_notebook_path("simple_execute.ipynb"))
+        test_nb = load_notebook_node(SIMPLE_EXECUTE_PATH)
         test_nb.cells[0]['metadata']['tags'].append('some tag')
 
         test_nb = parameterize_notebook(test_nb, {'msg': 'Hello'})
@@ -29,7 +31,7 @@ class TestNotebookParametrizing(unittest.TestCase):
         self.assertEqual(self.count_nb_injected_parameter_cells(test_nb), 1)
 
     def test_injected_parameters_tag(self):
-        test_nb = load_notebook_node(get_notebook_path("simple_execute.ipynb"))
+        test_nb = load_notebook_node(SIMPLE_EXECUTE_PATH)
 
         test_nb = parameterize_notebook(test_nb, {'msg': 'Hello'})
 
@@ -42,7 +44,7 @@ class TestNotebookParametrizing(unittest.TestCase):
         self.assertEqual(self.count_nb_injected_parameter_cells(test_nb), 1)
 
     def test_repeated_run_injected_parameters_tag(self):
-        test_nb = load_notebook_node(get_notebook_path("simple_execute.ipynb"))
+        test_nb = load_notebook_node(SIMPLE_EXECUTE_PATH)
         self.assertEqual(self.count_nb_injected_parameter_cells(test_nb), 0)
 
         test_nb = parameterize_notebook(test_nb, {'msg': 'Hello'})
@@ -52,7 +54,7 @@ class TestNotebookParametrizing(unittest.TestCase):
         self.assertEqual(self.count_nb_injected_parameter_cells(test_nb), 1)
 
     def test_no_parameter_tag(self):
-        test_nb = load_notebook_node(get_notebook_path("simple_execute.ipynb"))
+        test_nb = load_notebook_node(SIMPLE_EXECUTE_PATH)
         test_nb.cells[0]['metadata']['tags'] = []
 
         test_nb = parameterize_notebook(test_nb, {'msg': 'Hello'})
@@ -63,7 +65,7 @@ class TestNotebookParametrizing(unittest.TestCase):
         self.assertEqual(self.count_nb_injected_parameter_cells(test_nb), 1)
 
     def test_repeated_run_no_parameters_tag(self):
-        test_nb = load_notebook_node(get_notebook_path("simple_execute.ipynb"))
+        test_nb = load_notebook_node(SIMPLE_EXECUTE_PATH)
         test_nb.cells[0]['metadata']['tags'] = []
         self.assertEqual(self.count_nb_injected_parameter_cells(test_nb), 0)
 
@@ -74,7 +76,7 @@ class TestNotebookParametrizing(unittest.TestCase):
         self.assertEqual(self.count_nb_injected_parameter_cells(test_nb), 1)
 
     def test_custom_comment(self):
-        test_nb = load_notebook_node(get_notebook_path("simple_execute.ipynb"))
+        test_nb = load_notebook_node(SIMPLE_EXECUTE_PATH)
         test_nb = parameterize_notebook(test_nb, {'msg': 'Hello'}, comment='This is a custom comment')
 
         cell_one = test_nb.cells[1]
@@ -164,6 +166,6 @@ class TestPathParameterizing(unittest.TestCase):
         self.assertIsNone(parameterize_path(path=None, parameters=None))
 
     def test_path_of_notebook_node_returns_input(self):
-        test_nb = load_notebook_node(get_notebook_path("simple_execute.ipynb"))
+        test_nb = load_notebook_node(SIMPLE_EXECUTE_PATH)
         result_nb = parameterize_path(test_nb, parameters=None)
         self.assertIs(result_nb, test_nb)
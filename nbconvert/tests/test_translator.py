@@ -23,6 +23,8 @@ from nbconvert.models import Parameter
         (["foo", '"bar"'], '["foo", "\\"bar\\""]'),
         ([{"foo": "bar"}], '[{"foo": "bar"}]'),
         ([{"foo": '"bar"'}], '[{"foo": "\\"bar\\""}]'),
+        ({"foo": [1, 2.5, True, None]}, '{"foo": [1, 2.5, True, None]}'),
+        (["caf\u00e9", float('nan')], '["caf\\xe9", float(\'nan\')]'),
         (12345, '12345'),
         (-54321, '-54321'),
         (1.2345, '1.2345'),
@@ -187,6 +189,17 @@ def test_find_translator_with_exact_language():
     )
 
 
+def test_find_translator_after_register():
+    registry = translators.NBConvertTranslators()
+    my_new_language_translator = Mock()
+    my_new_kernel_translator = Mock()
+    registry.register("my_new_language", my_new_language_translator)
+    assert registry.find_translator("my_new_kernel", "my_new_language") is my_new_language_translator
+
+    registry.register("my_new_kernel", my_new_kernel_translator)
+    assert registry.find_translator("my_new_kernel", "my_new_language") is my_new_kernel_translator
+
+
 def test_find_translator_with_no_such_kernel_or_language():
     with pytest.raises(NBConvertlException):
         translators.nbconvert_translators.find_translator("unregistered_kernel", "unregistered_language")
@@ -8,7 +8,6 @@ import pytest
 from nbformat.v4 import new_code_cell, new_notebook
 
 from nbconvert.exceptions import NBConvertParameterOverwriteWarning
-from nbconvert.iorw import load_notebook_node
 from nbconvert.utils import (
     any_tagged_cell,
     chdir,
@@ -19,10 +18,13 @@ from nbconvert.utils import (
     nb_language,
     find_first_tagged_cell_index,
 )
-from nbconvert.tests import get_notebook_path
 
 
 class TestUtils(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _notebook(self, simple_execute_nb):
+        self.simple_execute_nb = simple_execute_nb
+
     def test_no_tagged_cell(self):
         nb = new_notebook(
             cells=[new_code_cell('a = 2', metadata={"tags": []})],
@@ -61,36 +63,28 @@ class TestUtils(unittest.TestCase):
         assert Path.cwd() == old_cwd
 
     def test_nb_has_kernel_name(self):
-        notebook_name = 'simple_execute.ipynb'
-        notebook_path = get_notebook_path(notebook_name)
-        nb = load_notebook_node(notebook_path)
+        nb = self.simple_execute_nb
 
         kernel_name = nb_kernel_name(nb)
 
         assert kernel_name == 'python3'
 
     def test_nb_language(self):
-        notebook_name = 'simple_execute.ipynb'
-        notebook_path = get_notebook_path(notebook_name)
-        nb = load_notebook_node(notebook_path)
+        nb = self.simple_execute_nb
 
         language = nb_language(nb)
 
         assert language == 'python'
 
     def test_find_first_tagged_cell_index_fail(self):
-        notebook_name = 'simple_execute.ipynb'
-        notebook_path = get_notebook_path(notebook_name)
-        nb = load_notebook_node(notebook_path)
+        nb = self.simple_execute_nb
 
         tagged_cell = find_first_tagged_cell_index(nb, 'tag')
 
         assert tagged_cell == -1
 
     def test_find_first_tagged_cell_index_success(self):
-        notebook_name = 'simple_execute.ipynb'
-        notebook_path = get_notebook_path(notebook_name)
-        nb = load_notebook_node(notebook_path)
+        nb = self.simple_execute_nb
 
         tagged_cell = find_first_tagged_cell_index(nb, 'parameters')
 
@@ -1,6 +1,9 @@
+import json
 import math
 import re
 import shlex
+from functools import lru_cache
+from types import MappingProxyType
 
 from nbconvert.exceptions import NBConvertlException
 from nbconvert.log import logger
@@ -15,12 +18,19 @@ class NBConvertTranslators:
     '''
 
     def __init__(self):
-        self._translators = {}
+        # Read-only view, only replaced by register, so the cached lookups cannot go stale
+        self._translators = MappingProxyType({})
+        # Per instance cache of the lookups, cleared whenever a translator is registered
+        self._find_translator_cached = lru_cache(maxsize=64)(self._find_translator)
 
     def register(self, language, translator):
-        self._translators[language] = translator
+        self._translators = MappingProxyType({**self._translators, language: translator})
+        self._find_translator_cached.cache_clear()
 
     def find_translator(self, kernel_name, language):
+        return self._find_translator_cached(kernel_name, language)
+
+    def _find_translator(self, kernel_name, language):
         if kernel_name in self._translators:
             return self._translators[kernel_name]
         elif language in self._translators:
@@ -161,11 +171,15 @@ class PythonTranslator(Translator):
 
     @classmethod
     def translate_dict(cls, val):
+        if _is_json_identical(val):
+            return json.dumps(val)
         escaped = ', '.join([f"{cls.translate_str(k)}: {cls.translate(v)}" for k, v in val.items()])
         return f'{{{escaped}}}'
 
     @classmethod
     def translate_list(cls, val):
+        if _is_json_identical(val):
+            return json.dumps(val)
         escaped = ', '.join([cls.translate(v) for v in val])
         return f'[{escaped}]'
 
@@ -185,7 +199,7 @@ class PythonTranslator(Translator):
         except ImportError:
             logger.debug("Black is not installed, parameters won't be formatted")
         except AttributeError as aerr:
-            logger.warning(f"Black encountered an error, skipping formatting ({aerr})")
+            logger.warning("Black encountered an error, skipping formatting (%s)", aerr)
         return content
 
     @classmethod
@@ -237,7 +251,8 @@ class PythonTranslator(Translator):
         grouped_variable = []
         accumulator = []
         for iline, line in enumerate(src.splitlines()):
-            if len(line.strip()) == 0 or line.strip().startswith('#'):
+            stripped_line = line.strip()
+            if len(stripped_line) == 0 or stripped_line.startswith('#'):
                 continue  # Skip blank and comment
 
             nequal = line.count("=")
@@ -245,7 +260,7 @@ class PythonTranslator(Translator):
                 grouped_variable.append(flatten_accumulator(accumulator))
                 accumulator = []
                 if nequal > 1:
-                    logger.warning(f"Unable to parse line {iline + 1} '{line}'.")
+                    logger.warning("Unable to parse line %d '%s'.", iline + 1, line)
                     continue
 
             accumulator.append(line)
@@ -255,7 +270,7 @@ class PythonTranslator(Translator):
             if len(definition) == 0:
                 continue
 
-            match = re.match(cls.PARAMETER_PATTERN, definition)
+            match = cls.PARAMETER_PATTERN.match(definition)
             if match is not None:
                 attr = match.groupdict()
                 if attr["target"] is None:  # Fail to get variable name
@@ -274,6 +289,36 @@ class PythonTranslator(Translator):
         return params
 
 
+def _is_json_identical(val):
+    """Whether ``json.dumps(val)`` gives the same Python source as the PythonTranslator walk.
+
+    That is the case for dicts and lists holding only strings of printable ASCII (escaped alike),
+    ints and finite floats, while booleans, None, NaN and other types are translated differently.
+    """
+    stack = [val]
+    while stack:
+        item = stack.pop()
+        item_type = type(item)
+        if item_type is str:
+            if not (item.isascii() and item.isprintable()):
+                return False
+        elif item_type is int:
+            continue
+        elif item_type is float:
+            if not math.isfinite(item):
+                return False
+        elif isinstance(item, dict):
+            for key in item:
+                if type(key) is not str or not (key.isascii() and key.isprintable()):
+                    return False
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        else:
+            return False
+    return True
+
+
 class BashTranslator(Translator):
     @classmethod
     def translate_none(cls, val):
@@ -162,7 +162,7 @@ def retry(num):
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    logger.debug(f'Retrying after: {e}')
+                    logger.debug('Retrying after: %s', e)
                     exception = e
             else:
                 raise exception
@@ -8,23 +8,23 @@ https://packaging.python.org/en/latest/distributing.html
 https://github.com/pypa/sampleproject
 
 """
-import os
+import re
+from pathlib import Path
 
 from setuptools import setup
 
-local_path = os.path.dirname(__file__)
-# Fix for tox which manipulates execution pathing
-if not local_path:
-    local_path = '.'
-here = os.path.abspath(local_path)
+# Resolved from the file itself, tox manipulates the execution pathing
+_HERE = Path(__file__).resolve().parent
+_DEV_REQUIREMENTS = _HERE / 'dev_requirements'
+
+_VERSION_RE = re.compile(r'^version\s*=\s*[\'"]([^\'"]+)[\'"]', re.M)
 
 
 def version():
-    with open(f"{here}/nbconvert/version.py") as ver:
-        for line in ver.readlines():
-            if line.startswith('version ='):
-                return line.split(' = ')[-1].strip()[1:-1]
-    raise ValueError('No version found in nbconvert/version.py')
+    match = _VERSION_RE.search(read(_HERE / 'nbconvert' / 'version.py'))
+    if match is None:
+        raise ValueError('No version found in nbconvert/version.py')
+    return match.group(1)
 
 
 def read(fname):
@@ -33,9 +33,14 @@ def read(fname):
 
 
 def read_requirements(fname, folder=None):
-    path_dir = os.path.join(here, folder) if folder else here
-    req_path = os.path.join(path_dir, fname)
-    return [req.strip() for req in read(req_path).splitlines() if req.strip()]
+    if folder == 'dev_requirements':
+        req_path = _DEV_REQUIREMENTS / fname
+    else:
+        req_path = (_HERE / folder if folder else _HERE) / fname
+    # Each line is stripped once and blank lines dropped by the builtin iterators
+    reqs = filter(None, map(str.strip, req_path.read_text(encoding='utf-8').splitlines()))
+    # Skip comment lines. Immutable, the extras below share these sequences
+    return tuple(req for req in reqs if not req.startswith('#'))
 
 
 s3_reqs = read_requirements('s3.txt', folder='dev_requirements')
@@ -43,10 +48,26 @@ azure_reqs = read_requirements('azure.txt', folder='dev_requirements')
 gcs_reqs = read_requirements('gcs.txt', folder='dev_requirements')
 github_reqs = read_requirements('github.txt', folder='dev_requirements')
 docs_only_reqs = read_requirements('docs.txt', folder='dev_requirements')
-black_reqs = ['black >= 19.3b0']
-all_reqs = s3_reqs + azure_reqs + gcs_reqs + black_reqs
-docs_reqs = all_reqs + docs_only_reqs
-dev_reqs = read_requirements('dev.txt', folder='dev_requirements') + s3_reqs + azure_reqs + gcs_reqs + github_reqs + black_reqs  # all_reqs
+black_reqs = ('black >= 19.3b0',)
+# Storage backends and formatter, shared by the all and docs extras. Combinations are
+# unpacked in a single pass rather than through intermediate concatenations, and
+# requirements listed in several files are kept once, in their first position
+_common = tuple(dict.fromkeys((*s3_reqs, *azure_reqs, *gcs_reqs, *black_reqs)))
+all_reqs = _common
+docs_reqs = tuple(dict.fromkeys((*_common, *docs_only_reqs)))
+dev_reqs = tuple(
+    dict.fromkeys(
+        (
+            *read_requirements('dev.txt', folder='dev_requirements'),
+            *s3_reqs,
+            *azure_reqs,
+            *gcs_reqs,
+            *github_reqs,
+            *black_reqs,
+        )
+    )
+)  # all_reqs
+# The tuples are shared as is, setuptools only iterates over them
 extras_require = {
     "test": dev_reqs,
     "dev": dev_reqs,